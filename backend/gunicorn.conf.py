@@ -0,0 +1,17 @@
+# gunicorn -c gunicorn.conf.py server:app
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8001")
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Every worker keeps its own Mongo pool (minPoolSize=5, maxPoolSize=20), so
+# the default is capped at 4 workers: at most 20 idle and 80 open connections.
+# Set WEB_CONCURRENCY to size it explicitly.
+workers = int(os.environ.get("WEB_CONCURRENCY", min(multiprocessing.cpu_count() * 2 + 1, 4)))
+
+# The program cache is per process and delete_program only invalidates the
+# worker that handled the delete, so it is turned off when running several
+# workers.
+if workers > 1:
+    os.environ.setdefault("PROGRAM_CACHE_SIZE", "0")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+One-off migration of programs saved before ids became ObjectId hex strings
+
+Rewrites every legacy program to the current storage format:
+- `_id` is a 24-character hex string whose timestamp is the creation time
+  (ObjectId `_id`s keep their value; UUID ones get a new id)
+- `created_at` is UTC epoch milliseconds instead of a BSON Date
+- the old separate `id` field is removed
+
+Run once from the backend directory, with the same .env as the server:
+    python migrate_programs.py
+It is safe to re-run; programs already in the current format are skipped.
+"""
+
+import asyncio
+import hashlib
+import os
+import struct
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from bson import ObjectId
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
+
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_millis(created_at) -> int:
+    if isinstance(created_at, datetime):
+        if created_at.tzinfo is not None:
+            created_at = created_at.replace(tzinfo=None) - created_at.utcoffset()
+        return (created_at - EPOCH) // timedelta(milliseconds=1)
+    return int(created_at)
+
+
+def to_program_id(old_id, created_at: int) -> str:
+    if isinstance(old_id, ObjectId):
+        return str(old_id)
+    if isinstance(old_id, str) and len(old_id) == 24 and ObjectId.is_valid(old_id):
+        return old_id.lower()
+    # Timestamp prefix keeps newest-first ordering; the rest is derived from
+    # the old id so a re-run after a partial failure produces the same _id
+    suffix = hashlib.sha1(str(old_id).encode()).digest()[:8]
+    return str(ObjectId(struct.pack(">I", created_at // 1000) + suffix))
+
+
+async def migrate(db) -> int:
+    migrated = 0
+    async for program in db.programs.find({}):
+        old_id = program.pop("_id")
+        had_id_field = program.pop("id", None) is not None
+        created_at = to_millis(program["created_at"])
+        new_id = to_program_id(old_id, created_at)
+
+        if new_id == old_id and program["created_at"] == created_at and not had_id_field:
+            continue
+
+        program["created_at"] = created_at
+        if new_id == old_id:
+            await db.programs.update_one(
+                {"_id": old_id},
+                {"$set": {"created_at": created_at}, "$unset": {"id": ""}},
+            )
+        else:
+            try:
+                await db.programs.insert_one({"_id": new_id, **program})
+            except DuplicateKeyError:
+                pass  # Copied by an earlier run that stopped before the delete
+            await db.programs.delete_one({"_id": old_id})
+        migrated += 1
+    if migrated:
+        # Invalidate list ETags handed out before the migration
+        await db.versions.update_one({"_id": "programs"}, {"$inc": {"v": 1}}, upsert=True)
+    return migrated
+
+
+async def main():
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    try:
+        migrated = await migrate(client[os.environ['DB_NAME']])
+        print(f"Migrated {migrated} programs")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
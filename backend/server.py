@@ -1,29 +1,69 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import ORJSONResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from starlette.middleware.gzip import GZipMiddleware
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from bson import ObjectId
+from async_lru import alru_cache
 import os
+import asyncio
 import logging
 from pathlib import Path
-from pydantic import BaseModel, Field
-from typing import List, Optional
-import uuid
-from datetime import datetime
+from contextlib import asynccontextmanager
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field, TypeAdapter, field_serializer
+from typing import Annotated, List, Optional
+import time
+import hashlib
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
 
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# MongoDB connection, opened per worker in lifespan
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # uvicorn's default --loop auto picks uvloop when it is installed
+    logger.info("Serving on %s", type(asyncio.get_running_loop()).__name__)
+    
+    # Created on the serving loop rather than at import so each worker
+    # process owns its pool
+    app.state.client = AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=20,
+        minPoolSize=5,
+        serverSelectionTimeoutMS=2000,
+        waitQueueTimeoutMS=1000,
+    )
+    app.state.db = app.state.client[os.environ['DB_NAME']]
+    # Open the first connections before serving traffic
+    await app.state.db.command("ping")
+    yield
+    app.state.client.close()
+
+def get_db(request: Request) -> AsyncIOMotorDatabase:
+    return request.app.state.db
 
 # Create the main app without a prefix
-app = FastAPI()
+app = FastAPI(default_response_class=ORJSONResponse, lifespan=lifespan)
 
 # Create a router with the /api prefix
-api_router = APIRouter(prefix="/api")
+api_router = APIRouter(prefix="/api", default_response_class=ORJSONResponse)
+
+
+# created_at is stored as UTC epoch milliseconds and rendered as the naive
+# ISO string clients have always received
+EPOCH = datetime(1970, 1, 1)
+
+def now_millis() -> int:
+    return time.time_ns() // 1_000_000
+
+def millis_to_datetime(millis: int) -> datetime:
+    return EPOCH + timedelta(milliseconds=millis)
 
 
 # Define Models
@@ -33,71 +73,225 @@ class Command(BaseModel):
     distance: Optional[int] = None
 
 class RobotProgram(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    # Stored as the Mongo primary key so lookups use the built-in _id index.
+    # ObjectId hex strings start with a timestamp, so newest-first listing is
+    # a reverse scan of that same index.
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id", default_factory=lambda: str(ObjectId()))
     name: str
     commands: List[Command]
     environment: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: int = Field(default_factory=now_millis)
+
+    @field_serializer("created_at", when_used="json")
+    def serialize_created_at(self, created_at: int) -> str:
+        return millis_to_datetime(created_at).isoformat()
+
+class RobotProgramSummary(BaseModel):
+    """List view of a program; the commands are only sent by get_program"""
+    model_config = ConfigDict(populate_by_name=True)
+
+    id: str = Field(alias="_id")
+    name: str
+    environment: str
+    command_count: int
+    created_at: datetime
 
 class RobotProgramCreate(BaseModel):
     name: str
     commands: List[Command]
     environment: str
 
+def validate_program_id(value: str) -> str:
+    if len(value) != 24 or not ObjectId.is_valid(value):
+        raise ValueError("program id must be a 24-character hex ObjectId")
+    return value.lower()
+
+# Ids are ObjectId hex strings; anything else is rejected with a 422 before
+# the handler touches the database
+ProgramId = Annotated[str, AfterValidator(validate_program_id)]
+
+# Built once so list responses serialize in a single pydantic-core call
+PROGRAM_LIST_ADAPTER = TypeAdapter(List[RobotProgram])
+
+
+# Conditional GET helpers
+def etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+    return etag in candidates or "*" in candidates
+
+def http_date(millis: int) -> str:
+    return format_datetime(millis_to_datetime(millis).replace(tzinfo=timezone.utc), usegmt=True)
+
+
+# Programs never change once saved, so found programs are cached in-process
+# and delete_program invalidates the entry. That is only coherent within a
+# single process, so multi-worker deployments run with PROGRAM_CACHE_SIZE=0
+# (see gunicorn.conf.py).
+PROGRAM_CACHE_SIZE = int(os.environ.get('PROGRAM_CACHE_SIZE', '4096'))
+
+class ProgramNotFound(Exception):
+    pass
+
+@alru_cache(maxsize=PROGRAM_CACHE_SIZE)
+async def fetch_cached_program(program_id: str) -> dict:
+    # Keyed on the id alone, so the database comes from app state, not Depends
+    program = await app.state.db.programs.find_one({"_id": program_id})
+    if program is None:
+        # alru_cache drops calls that raise, so misses never take a slot
+        raise ProgramNotFound(program_id)
+    return program
+
+async def fetch_program(program_id: str) -> Optional[dict]:
+    if not PROGRAM_CACHE_SIZE:
+        return await app.state.db.programs.find_one({"_id": program_id})
+    try:
+        return await fetch_cached_program(program_id)
+    except ProgramNotFound:
+        return None
+
+
+# Bumped after every API write so list ETags change even when a create and
+# a delete leave the newest id and the count where they were
+async def bump_programs_version(db: AsyncIOMotorDatabase):
+    await db.versions.update_one({"_id": "programs"}, {"$inc": {"v": 1}}, upsert=True)
+
 
 # Routes
 @api_router.get("/")
 async def root():
     return {"message": "Robotics Simulator API"}
 
-@api_router.post("/programs", response_model=RobotProgram)
-async def create_program(program_input: RobotProgramCreate):
+@api_router.post("/programs", response_model=RobotProgram, response_model_by_alias=False)
+async def create_program(program_input: RobotProgramCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Save a robot program to the database
     """
     program_dict = program_input.dict()
     program_obj = RobotProgram(**program_dict)
     
-    await db.programs.insert_one(program_obj.dict())
+    await db.programs.insert_one(program_obj.dict(by_alias=True))
+    await bump_programs_version(db)
     return program_obj
 
-@api_router.get("/programs", response_model=List[RobotProgram])
-async def get_programs():
+@api_router.post("/programs/bulk", response_model=List[RobotProgram], response_model_by_alias=False)
+async def create_programs(program_inputs: List[RobotProgramCreate], db: AsyncIOMotorDatabase = Depends(get_db)):
     """
-    Get all saved robot programs
+    Save several robot programs in a single database round-trip
     """
-    programs = await db.programs.find().sort("created_at", -1).to_list(1000)
-    return [RobotProgram(**program) for program in programs]
+    program_objs = [RobotProgram(**program_input.dict()) for program_input in program_inputs]
+    
+    if program_objs:
+        await db.programs.insert_many(
+            [program_obj.dict(by_alias=True) for program_obj in program_objs],
+            ordered=False,
+        )
+        await bump_programs_version(db)
+    return Response(content=PROGRAM_LIST_ADAPTER.dump_json(program_objs), media_type="application/json")
 
-@api_router.get("/programs/{program_id}", response_model=RobotProgram)
-async def get_program(program_id: str):
+@api_router.get("/programs", response_model=List[RobotProgramSummary], response_model_by_alias=False)
+async def get_programs(
+    request: Request,
+    limit: int = Query(50, ge=1, le=1000),
+    before: Optional[ProgramId] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db),
+):
+    """
+    Get saved robot programs, newest first, one page at a time.
+    Pass the X-Next-Cursor header value as `before` to fetch the next page.
+    """
+    # Programs are immutable, so the list only changes on a create or delete.
+    # The write counter catches every API write; the newest listable id and
+    # the count (index and metadata reads, no scan) catch direct writes.
+    # ObjectIds from different workers in the same second are not ordered,
+    # so the newest id alone would miss some creates.
+    written = await db.versions.find_one({"_id": "programs"})
+    newest = await db.programs.find_one(
+        {"_id": {"$type": "string"}}, sort=[("_id", -1)], projection={"_id": 1}
+    )
+    count = await db.programs.estimated_document_count()
+    version = ":".join([
+        str(written["v"]) if written else "0",
+        newest["_id"] if newest else "empty",
+        str(count),
+    ])
+    etag = '"%s"' % hashlib.sha1(f"{version}:{limit}:{before}".encode()).hexdigest()
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    # Programs saved before ids were ObjectId strings (see migrate_programs.py)
+    # would sort first and fail to serialize, so only string ids are listed
+    query = {"_id": {"$type": "string", "$lt": before}} if before else {"_id": {"$type": "string"}}
+    programs = await db.programs.aggregate([
+        {"$match": query},
+        {"$sort": {"_id": -1}},
+        {"$limit": limit},
+        # Rename _id in the server so documents go to orjson untouched
+        {"$project": {
+            "_id": 0,
+            "id": "$_id",
+            "name": 1,
+            "environment": 1,
+            "created_at": {"$toDate": "$created_at"},
+            "command_count": {"$size": "$commands"},
+        }},
+    ]).to_list(limit)
+    headers = {"ETag": etag}
+    if len(programs) == limit:
+        headers["X-Next-Cursor"] = programs[-1]["id"]
+    # Documents were validated on write; returning a response directly skips
+    # FastAPI's response_model pass as well
+    return ORJSONResponse(content=programs, headers=headers)
+
+@api_router.get("/programs/{program_id}", response_model=RobotProgram, response_model_by_alias=False)
+async def get_program(program_id: ProgramId, request: Request, response: Response):
     """
     Get a specific robot program by ID
     """
-    program = await db.programs.find_one({"id": program_id})
+    program = await fetch_program(program_id)
     if not program:
         raise HTTPException(status_code=404, detail="Program not found")
+    
+    # Programs never change once saved, so the id is a stable validator
+    headers = {"ETag": f'"{program_id}"', "Last-Modified": http_date(program["created_at"])}
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
     return RobotProgram(**program)
 
 @api_router.delete("/programs/{program_id}")
-async def delete_program(program_id: str):
+async def delete_program(program_id: ProgramId, db: AsyncIOMotorDatabase = Depends(get_db)):
     """
     Delete a robot program
     """
-    result = await db.programs.delete_one({"id": program_id})
+    result = await db.programs.delete_one({"_id": program_id})
+    fetch_cached_program.cache_invalidate(program_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Program not found")
+    await bump_programs_version(db)
     return {"message": "Program deleted successfully"}
 
 # Include the router in the main app
 app.include_router(api_router)
 
+# Program lists are repetitive JSON; small bodies are not worth compressing
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# An explicit allow-list lets browsers cache preflights for max_age seconds
+cors_origins = os.environ.get('CORS_ORIGINS', 'https://sim-robotics.preview.emergentagent.com')
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_origins=[origin.strip() for origin in cors_origins.split(',') if origin.strip()],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["content-type", "if-none-match"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+    max_age=86400,
 )
 
 # Configure logging
@@ -105,8 +299,4 @@ logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
-logger = logging.getLogger(__name__)
-
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+logger = logging.getLogger(__name__)
\ No newline at end of file
@@ -4,9 +4,11 @@ Backend API Testing for Robotics Simulator
 Tests all CRUD operations and error handling scenarios
 """
 
-import requests
+import asyncio
+import httpx
 import json
 import sys
+import uuid
 from datetime import datetime
 
 # Get backend URL from environment
@@ -17,6 +19,8 @@ class RoboticsAPITester:
         self.base_url = BACKEND_URL
         self.test_results = []
         self.created_program_id = None
+        # Shared client so the run reuses keep-alive connections
+        self.client = httpx.AsyncClient(headers={"Content-Type": "application/json"}, timeout=30)
         
     def log_test(self, test_name, success, message, response_data=None):
         """Log test results"""
@@ -30,10 +34,10 @@ class RoboticsAPITester:
             "response_data": response_data
         })
         
-    def test_root_endpoint(self):
+    async def test_root_endpoint(self):
         """Test GET /api/ - Root endpoint"""
         try:
-            response = requests.get(f"{self.base_url}/")
+            response = await self.client.get(f"{self.base_url}/")
             
             if response.status_code == 200:
                 data = response.json()
@@ -47,7 +51,7 @@ class RoboticsAPITester:
         except Exception as e:
             self.log_test("Root Endpoint", False, f"Connection error: {str(e)}")
     
-    def test_create_program(self):
+    async def test_create_program(self):
         """Test POST /api/programs - Create a new robot program"""
         test_program = {
             "name": "Test Program 1",
@@ -60,10 +64,9 @@ class RoboticsAPITester:
         }
         
         try:
-            response = requests.post(
+            response = await self.client.post(
                 f"{self.base_url}/programs",
-                json=test_program,
-                headers={"Content-Type": "application/json"}
+                json=test_program
             )
             
             if response.status_code == 200:
@@ -92,10 +95,46 @@ class RoboticsAPITester:
         except Exception as e:
             self.log_test("Create Program", False, f"Request error: {str(e)}")
     
-    def test_list_programs(self):
+    async def test_bulk_create_programs(self):
+        """Test POST /api/programs/bulk - Create several programs at once"""
+        test_programs = [
+            {
+                "name": f"Bulk Program {i}",
+                "commands": [{"id": "1", "action": "forward"}],
+                "environment": "Open Space"
+            }
+            for i in range(1, 3)
+        ]
+        
+        try:
+            response = await self.client.post(
+                f"{self.base_url}/programs/bulk",
+                json=test_programs
+            )
+            
+            if response.status_code == 200:
+                data = response.json()
+                names = [prog.get("name") for prog in data]
+                
+                if names == [prog["name"] for prog in test_programs] and all(prog.get("id") for prog in data):
+                    self.log_test("Bulk Create Programs", True, f"Created {len(data)} programs in one request", data)
+                else:
+                    self.log_test("Bulk Create Programs", False, f"Unexpected programs returned: {names}", data)
+                
+                # Clean up so the list test only sees the main test program
+                for prog in data:
+                    if prog.get("id"):
+                        await self.client.delete(f"{self.base_url}/programs/{prog['id']}")
+            else:
+                self.log_test("Bulk Create Programs", False, f"Status code {response.status_code}: {response.text}")
+                
+        except Exception as e:
+            self.log_test("Bulk Create Programs", False, f"Request error: {str(e)}")
+    
+    async def test_list_programs(self):
         """Test GET /api/programs - Get all saved programs"""
         try:
-            response = requests.get(f"{self.base_url}/programs")
+            response = await self.client.get(f"{self.base_url}/programs")
             
             if response.status_code == 200:
                 data = response.json()
@@ -103,9 +142,23 @@ class RoboticsAPITester:
                 if isinstance(data, list):
                     if len(data) > 0:
                         # Check if our created program is in the list
-                        program_found = any(prog.get("id") == self.created_program_id for prog in data)
-                        if program_found:
-                            self.log_test("List Programs", True, f"Retrieved {len(data)} programs, including our test program", {"count": len(data)})
+                        program = next((prog for prog in data if prog.get("id") == self.created_program_id), None)
+                        if program:
+                            # The list returns summaries: a command count instead of the commands
+                            problems = []
+                            if "commands" in program:
+                                problems.append("summary includes commands")
+                            if program.get("command_count") != 3:
+                                problems.append(f"expected command_count 3, got {program.get('command_count')}")
+                            try:
+                                datetime.fromisoformat(program.get("created_at"))
+                            except (TypeError, ValueError):
+                                problems.append(f"created_at is not ISO-8601: {program.get('created_at')}")
+                            
+                            if problems:
+                                self.log_test("List Programs", False, "; ".join(problems), program)
+                            else:
+                                self.log_test("List Programs", True, f"Retrieved {len(data)} programs, including our test program", {"count": len(data)})
                         else:
                             self.log_test("List Programs", False, f"Test program not found in list of {len(data)} programs", {"count": len(data)})
                     else:
@@ -118,14 +171,79 @@ class RoboticsAPITester:
         except Exception as e:
             self.log_test("List Programs", False, f"Request error: {str(e)}")
     
-    def test_get_single_program(self):
+    async def test_list_pagination(self):
+        """Test GET /api/programs paging with limit, X-Next-Cursor and before"""
+        try:
+            # Two fresh programs guarantee two pages of one; the second is the newest
+            response = await self.client.post(
+                f"{self.base_url}/programs/bulk",
+                json=[
+                    {"name": f"Paging Program {i}", "commands": [], "environment": "Open Space"}
+                    for i in range(1, 3)
+                ]
+            )
+            if response.status_code != 200:
+                self.log_test("List Pagination", False, f"Setup failed with status {response.status_code}: {response.text}")
+                return
+            created_ids = [prog["id"] for prog in response.json()]
+            
+            try:
+                first = await self.client.get(f"{self.base_url}/programs", params={"limit": 1})
+                cursor = first.headers.get("X-Next-Cursor")
+                first_ids = [prog.get("id") for prog in first.json()]
+                
+                if first.status_code != 200 or first_ids != [created_ids[1]] or cursor != created_ids[1]:
+                    self.log_test("List Pagination", False, f"First page: status {first.status_code}, ids {first_ids}, cursor {cursor}")
+                    return
+                
+                second = await self.client.get(f"{self.base_url}/programs", params={"limit": 1, "before": cursor})
+                second_ids = [prog.get("id") for prog in second.json()]
+                
+                if second.status_code == 200 and second_ids == [created_ids[0]]:
+                    self.log_test("List Pagination", True, "limit=1 pages follow X-Next-Cursor newest-first")
+                else:
+                    self.log_test("List Pagination", False, f"Second page: status {second.status_code}, ids {second_ids}, expected {created_ids[:1]}")
+            finally:
+                for program_id in created_ids:
+                    await self.client.delete(f"{self.base_url}/programs/{program_id}")
+                
+        except Exception as e:
+            self.log_test("List Pagination", False, f"Request error: {str(e)}")
+    
+    async def test_conditional_get(self):
+        """Test ETag / If-None-Match on the list and single-program endpoints"""
+        if not self.created_program_id:
+            self.log_test("Conditional GET", False, "No program ID available from create test")
+            return
+        
+        for test_name, url in [
+            ("Conditional GET - List", f"{self.base_url}/programs"),
+            ("Conditional GET - Single Program", f"{self.base_url}/programs/{self.created_program_id}"),
+        ]:
+            try:
+                response = await self.client.get(url)
+                etag = response.headers.get("ETag")
+                if response.status_code != 200 or not etag:
+                    self.log_test(test_name, False, f"Expected 200 with an ETag, got {response.status_code}, ETag {etag}")
+                    continue
+                
+                cached = await self.client.get(url, headers={"If-None-Match": etag})
+                if cached.status_code == 304 and not cached.content:
+                    self.log_test(test_name, True, f"Returned 304 for matching ETag {etag}")
+                else:
+                    self.log_test(test_name, False, f"Expected empty 304 for matching ETag, got {cached.status_code}")
+                    
+            except Exception as e:
+                self.log_test(test_name, False, f"Request error: {str(e)}")
+    
+    async def test_get_single_program(self):
         """Test GET /api/programs/{program_id} - Get specific program by ID"""
         if not self.created_program_id:
             self.log_test("Get Single Program", False, "No program ID available from create test")
             return
             
         try:
-            response = requests.get(f"{self.base_url}/programs/{self.created_program_id}")
+            response = await self.client.get(f"{self.base_url}/programs/{self.created_program_id}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -140,14 +258,14 @@ class RoboticsAPITester:
         except Exception as e:
             self.log_test("Get Single Program", False, f"Request error: {str(e)}")
     
-    def test_delete_program(self):
+    async def test_delete_program(self):
         """Test DELETE /api/programs/{program_id} - Delete a program"""
         if not self.created_program_id:
             self.log_test("Delete Program", False, "No program ID available from create test")
             return
             
         try:
-            response = requests.delete(f"{self.base_url}/programs/{self.created_program_id}")
+            response = await self.client.delete(f"{self.base_url}/programs/{self.created_program_id}")
             
             if response.status_code == 200:
                 data = response.json()
@@ -161,7 +279,7 @@ class RoboticsAPITester:
         except Exception as e:
             self.log_test("Delete Program", False, f"Request error: {str(e)}")
     
-    def test_verify_deletion(self):
+    async def test_verify_deletion(self):
         """Verify the program was actually deleted"""
         if not self.created_program_id:
             self.log_test("Verify Deletion", False, "No program ID available")
@@ -169,7 +287,7 @@ class RoboticsAPITester:
             
         try:
             # Try to get the deleted program
-            response = requests.get(f"{self.base_url}/programs/{self.created_program_id}")
+            response = await self.client.get(f"{self.base_url}/programs/{self.created_program_id}")
             
             if response.status_code == 404:
                 self.log_test("Verify Deletion", True, "Program successfully deleted (404 as expected)")
@@ -179,58 +297,66 @@ class RoboticsAPITester:
         except Exception as e:
             self.log_test("Verify Deletion", False, f"Request error: {str(e)}")
     
-    def test_error_handling(self):
-        """Test error handling scenarios"""
-        
-        # Test 1: Get non-existent program
-        try:
-            response = requests.get(f"{self.base_url}/programs/invalid-id-12345")
-            if response.status_code == 404:
-                self.log_test("Error Handling - Get Invalid ID", True, "Correctly returned 404 for invalid program ID")
-            else:
-                self.log_test("Error Handling - Get Invalid ID", False, f"Expected 404, got {response.status_code}")
-        except Exception as e:
-            self.log_test("Error Handling - Get Invalid ID", False, f"Request error: {str(e)}")
-        
-        # Test 2: Delete non-existent program
+    async def check_error_status(self, test_name, expected_status, description, method, url, **kwargs):
+        """Send one request and check it is rejected with the expected status"""
         try:
-            response = requests.delete(f"{self.base_url}/programs/invalid-id-12345")
-            if response.status_code == 404:
-                self.log_test("Error Handling - Delete Invalid ID", True, "Correctly returned 404 for invalid program ID")
+            response = await self.client.request(method, url, **kwargs)
+            if response.status_code == expected_status:
+                self.log_test(test_name, True, f"Correctly returned {expected_status} for {description}")
             else:
-                self.log_test("Error Handling - Delete Invalid ID", False, f"Expected 404, got {response.status_code}")
+                self.log_test(test_name, False, f"Expected {expected_status}, got {response.status_code}: {response.text}")
         except Exception as e:
-            self.log_test("Error Handling - Delete Invalid ID", False, f"Request error: {str(e)}")
+            self.log_test(test_name, False, f"Request error: {str(e)}")
+    
+    async def test_error_handling(self):
+        """Test error handling scenarios"""
         
-        # Test 3: Create program with missing fields
-        try:
-            invalid_program = {"name": "Incomplete Program"}  # Missing commands and environment
-            response = requests.post(
-                f"{self.base_url}/programs",
-                json=invalid_program,
-                headers={"Content-Type": "application/json"}
-            )
-            if response.status_code == 422:
-                self.log_test("Error Handling - Missing Fields", True, "Correctly returned 422 for missing required fields")
-            else:
-                self.log_test("Error Handling - Missing Fields", False, f"Expected 422, got {response.status_code}: {response.text}")
-        except Exception as e:
-            self.log_test("Error Handling - Missing Fields", False, f"Request error: {str(e)}")
+        # The checks are independent, so send them concurrently
+        await asyncio.gather(
+            # Malformed IDs are rejected before any database lookup
+            self.check_error_status(
+                "Error Handling - Get Invalid ID", 422, "malformed program ID",
+                "GET", f"{self.base_url}/programs/invalid-id-12345"
+            ),
+            self.check_error_status(
+                "Error Handling - Delete Invalid ID", 422, "malformed program ID",
+                "DELETE", f"{self.base_url}/programs/invalid-id-12345"
+            ),
+            self.check_error_status(
+                "Error Handling - Delete Unknown ID", 404, "unknown program ID",
+                "DELETE", f"{self.base_url}/programs/{uuid.uuid4().hex[:24]}"
+            ),
+            # Missing commands and environment
+            self.check_error_status(
+                "Error Handling - Missing Fields", 422, "missing required fields",
+                "POST", f"{self.base_url}/programs", json={"name": "Incomplete Program"}
+            ),
+        )
     
-    def run_all_tests(self):
+    async def run_all_tests(self):
         """Run all test scenarios"""
         print(f"🤖 Starting Robotics Simulator Backend API Tests")
         print(f"📡 Backend URL: {self.base_url}")
         print("=" * 60)
         
-        # Run tests in sequence
-        self.test_root_endpoint()
-        self.test_create_program()
-        self.test_list_programs()
-        self.test_get_single_program()
-        self.test_delete_program()
-        self.test_verify_deletion()
-        self.test_error_handling()
+        # Independent tests run concurrently; the create -> read -> delete chain stays ordered
+        await asyncio.gather(
+            self.test_root_endpoint(),
+            self.test_create_program(),
+            self.test_error_handling(),
+        )
+        # Bulk create cleans up after itself before the list test runs
+        await self.test_bulk_create_programs()
+        await asyncio.gather(
+            self.test_list_programs(),
+            self.test_get_single_program(),
+        )
+        # Both compare consecutive responses, so nothing else may write meanwhile
+        await self.test_list_pagination()
+        await self.test_conditional_get()
+        await self.test_delete_program()
+        await self.test_verify_deletion()
+        await self.client.aclose()
         
         # Summary
         print("\n" + "=" * 60)
@@ -256,7 +382,7 @@ class RoboticsAPITester:
 
 if __name__ == "__main__":
     tester = RoboticsAPITester()
-    success = tester.run_all_tests()
+    success = asyncio.run(tester.run_all_tests())
     
     if success:
         print("\n🎉 All tests passed!")
@@ -95,6 +95,7 @@ export default function Index() {
   const [showLoadModal, setShowLoadModal] = useState(false);
   const [programName, setProgramName] = useState('');
   const [savedPrograms, setSavedPrograms] = useState<any[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const executionRef = useRef<NodeJS.Timeout | null>(null);
 
   const EXPO_PUBLIC_BACKEND_URL = process.env.EXPO_PUBLIC_BACKEND_URL;
@@ -107,12 +108,15 @@ export default function Index() {
     loadSavedPrograms();
   }, []);
 
-  const loadSavedPrograms = async () => {
+  // The API returns one page at a time; `before` fetches the page after that cursor
+  const loadSavedPrograms = async (before?: string) => {
     try {
-      const response = await fetch(`${EXPO_PUBLIC_BACKEND_URL}/api/programs`);
+      const query = before ? `?before=${encodeURIComponent(before)}` : '';
+      const response = await fetch(`${EXPO_PUBLIC_BACKEND_URL}/api/programs${query}`);
       if (response.ok) {
         const data = await response.json();
-        setSavedPrograms(data);
+        setSavedPrograms((previous) => (before ? [...previous, ...data] : data));
+        setNextCursor(response.headers.get('X-Next-Cursor'));
       }
     } catch (error) {
       console.error('Error loading programs:', error);
@@ -270,13 +274,24 @@ export default function Index() {
     }
   };
 
-  const loadProgram = (program: any) => {
-    setCommands(program.commands);
-    const env = ENVIRONMENTS.find((e) => e.name === program.environment);
-    if (env) setCurrentEnvironment(env);
-    setShowLoadModal(false);
-    resetRobot();
-    Alert.alert('Success', `Loaded program: ${program.name}`);
+  const loadProgram = async (programId: string) => {
+    try {
+      const response = await fetch(`${EXPO_PUBLIC_BACKEND_URL}/api/programs/${programId}`);
+      if (!response.ok) {
+        Alert.alert('Error', 'Failed to load program');
+        return;
+      }
+
+      const program = await response.json();
+      setCommands(program.commands);
+      const env = ENVIRONMENTS.find((e) => e.name === program.environment);
+      if (env) setCurrentEnvironment(env);
+      setShowLoadModal(false);
+      resetRobot();
+      Alert.alert('Success', `Loaded program: ${program.name}`);
+    } catch (error) {
+      Alert.alert('Error', 'Failed to load program');
+    }
   };
 
   const deleteProgram = async (programId: string) => {
@@ -574,11 +589,11 @@ export default function Index() {
                   <View key={program.id} style={styles.programItem}>
                     <TouchableOpacity
                       style={styles.programItemContent}
-                      onPress={() => loadProgram(program)}
+                      onPress={() => loadProgram(program.id)}
                     >
                       <Text style={styles.programItemName}>{program.name}</Text>
                       <Text style={styles.programItemDetails}>
-                        {program.commands.length} commands • {program.environment}
+                        {program.command_count} commands • {program.environment}
                       </Text>
                     </TouchableOpacity>
                     <TouchableOpacity onPress={() => deleteProgram(program.id)}>
@@ -587,6 +602,14 @@ export default function Index() {
                   </View>
                 ))
               )}
+              {nextCursor && (
+                <TouchableOpacity
+                  style={styles.loadMoreButton}
+                  onPress={() => loadSavedPrograms(nextCursor)}
+                >
+                  <Text style={styles.loadMoreText}>Load more</Text>
+                </TouchableOpacity>
+              )}
             </ScrollView>
             <TouchableOpacity
               style={[styles.modalButton, styles.cancelButton, { width: '100%' }]}
@@ -891,4 +914,13 @@ const styles = StyleSheet.create({
     textAlign: 'center',
     padding: 20,
   },
+  loadMoreButton: {
+    padding: 12,
+    alignItems: 'center',
+  },
+  loadMoreText: {
+    color: '#4CAF50',
+    fontSize: 14,
+    fontWeight: '600',
+  },
 });
\ No newline at end of file